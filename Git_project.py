@@ -1,12 +1,74 @@
 import datetime
 import json
+import math
+import mmap
 import os
-from typing import List, Dict, Optional
+import pickle
+import re
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import List, Dict, Iterable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library
+    orjson = None
+
+def _dumps(obj: Dict) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed"""
+    # orjson writes NaN and infinity as null, so keep json's NaN/Infinity
+    # for those values rather than losing them
+    if orjson is not None and all(math.isfinite(value) for value in obj.values()
+                                  if isinstance(value, float)):
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def _loads(data: bytes):
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity, which only the json module accepts
+    return json.loads(data)
+
+def _read_items(path: str) -> Tuple[List[Dict], bool]:
+    """Read activity dicts from a data file
+    
+    Returns the items and whether the file used the older single JSON
+    array format instead of JSON Lines.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file
+            return [], False
+        # Read lines straight from the mapped file instead of copying it
+        # through Python's buffered reader
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = re.search(rb"\S", mm)
+            if first is not None and first.group() == b"[":
+                return _loads(mm.read()), True
+            return [_loads(line) for line in iter(mm.readline, b"")
+                    if line.strip()], False
+
+def _window_totals(rows: array, calories: array,
+                   durations: array) -> Tuple[float, float, int]:
+    """Sum the calorie and duration columns over the given rows"""
+    return (float(sum(map(calories.__getitem__, rows))),
+            float(sum(map(durations.__getitem__, rows))),
+            len(rows))
 
 class FitnessActivity:
+    __slots__ = ('activity_type', 'duration', 'calories', 'distance', 'notes',
+                 'date', '_date_obj', '_type_lc', '_json_bytes')
+    
     def __init__(self, activity_type: str, duration: float, calories: float, 
                  date: str = None, distance: float = None, notes: str = None):
-        self.activity_type = activity_type
+        # Interned so repeated types share one string object
+        self.activity_type = sys.intern(activity_type)
+        self._type_lc = sys.intern(activity_type.lower())  # normalized once for type lookups
         self.duration = duration  # in minutes
         self.calories = calories  # calories burned
         self.distance = distance  # in kilometers (optional)
@@ -14,6 +76,9 @@ class FitnessActivity:
         
         # Set date to current date if not provided
         self.date = date if date else datetime.datetime.now().strftime("%Y-%m-%d")
+        # Parsed once here so date comparisons don't re-parse the string
+        self._date_obj = datetime.date.fromisoformat(self.date)
+        self._json_bytes: Optional[bytes] = None  # serialized form, built on first save
     
     def to_dict(self) -> Dict:
         """Convert activity to dictionary for storage"""
@@ -26,6 +91,16 @@ class FitnessActivity:
             'notes': self.notes
         }
     
+    def to_json(self) -> bytes:
+        """Serialize the activity, reusing the bytes from earlier saves"""
+        if self._json_bytes is None:
+            self._json_bytes = _dumps(self.to_dict())
+        return self._json_bytes
+    
+    def invalidate(self) -> None:
+        """Drop the cached serialized form after changing a field"""
+        self._json_bytes = None
+    
     @classmethod
     def from_dict(cls, data: Dict) -> 'FitnessActivity':
         """Create activity from dictionary"""
@@ -39,86 +114,339 @@ class FitnessActivity:
         )
 
 class FitnessTracker:
-    def __init__(self, data_file: str = 'fitness_data.json'):
+    def __init__(self, data_file: str = 'fitness_data.jsonl'):
         self.data_file = data_file
         self.activities: List[FitnessActivity] = []
+        # Lookup indexes so date/type queries don't scan every activity
+        self._by_date: Dict[str, List[FitnessActivity]] = defaultdict(list)
+        self._by_type: Dict[str, List[FitnessActivity]] = defaultdict(list)
+        # Column copies of the numeric fields, parallel to self.activities,
+        # so aggregates read packed values instead of object attributes
+        self._cal_arr = array('d')
+        self._dur_arr = array('d')
+        self._date_arr = array('i')  # date ordinals fit in 32 bits
+        # Date ordinals in sorted order, with the row each one belongs to,
+        # so a date range can be located by bisection
+        self._date_keys = array('i')
+        self._date_rows = array('i')
+        # Running totals: inserts add to them incrementally, while deletes
+        # and loads re-sum the columns exactly with math.fsum. An incremental
+        # total can differ from the exact sum by float rounding in the last
+        # digits until the next re-sum.
+        self._total_calories = 0.0
+        self._total_duration = 0.0
+        # Weekly summaries keyed by weeks_ago for _weekly_cache_day only;
+        # cleared on every mutation and when the day changes
+        self._weekly_cache: Dict[int, Dict] = {}
+        self._weekly_cache_day: Optional[datetime.date] = None
+        # Unsaved changes; written on every mutation unless autosave is off
+        self._dirty = False
+        self._autosave = True
+        self._batch_depth = 0
+        self._batch_backup: Optional[Tuple[List[FitnessActivity], bool]] = None
         self.load_data()
     
+    def __enter__(self) -> 'FitnessTracker':
+        """Batch mutations, deferring the write until the block exits
+        
+        If the block raises, nothing is written and the tracker returns to
+        the state it was in when the outermost block was entered.
+        """
+        if self._batch_depth == 0:
+            self._batch_backup = (list(self.activities), self._dirty)
+        self._batch_depth += 1
+        self._autosave = False
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            activities, dirty = self._batch_backup
+            self._batch_backup = None
+            self._autosave = True
+            if exc_type is None:
+                self.flush()
+            else:
+                self.activities = activities
+                self._rebuild_indexes()
+                self._dirty = dirty
+    
+    def _mark_dirty(self) -> None:
+        """Record an unsaved change and write it out if autosave is on"""
+        self._dirty = True
+        if self._autosave:
+            self.save_data()
+    
+    def flush(self) -> None:
+        """Save activities to file if there are unsaved changes"""
+        if self._dirty:
+            self.save_data()
+    
+    def _index_activity(self, activity: FitnessActivity) -> None:
+        """Add an activity to the indexes and the end of the columns"""
+        self._by_date[activity.date].append(activity)
+        self._by_type[activity._type_lc].append(activity)
+        self._cal_arr.append(activity.calories)
+        self._dur_arr.append(activity.duration)
+        self._date_arr.append(activity._date_obj.toordinal())
+    
+    def _unindex_activity(self, activity: FitnessActivity) -> None:
+        """Remove an activity from the date and type indexes"""
+        for index, key in ((self._by_date, activity.date),
+                           (self._by_type, activity._type_lc)):
+            bucket = index[key]
+            bucket.remove(activity)
+            if not bucket:
+                del index[key]
+    
+    def _rebuild_indexes(self) -> None:
+        """Rebuild the indexes, columns and totals from the activity list"""
+        self._by_date.clear()
+        self._by_type.clear()
+        for column in (self._cal_arr, self._dur_arr, self._date_arr):
+            del column[:]
+        for activity in self.activities:
+            self._index_activity(activity)
+        dates = self._date_arr
+        self._date_rows = array('i', sorted(range(len(dates)), key=dates.__getitem__))
+        self._date_keys = array('i', map(dates.__getitem__, self._date_rows))
+        self._recompute_totals()
+        self._weekly_cache.clear()
+    
+    def _recompute_totals(self) -> None:
+        """Recompute the running totals exactly from the columns"""
+        self._total_calories = math.fsum(self._cal_arr)
+        self._total_duration = math.fsum(self._dur_arr)
+    
+    def _date_slot(self, row: int) -> int:
+        """Find the position of a row in the sorted date index"""
+        pos = bisect_left(self._date_keys, self._date_arr[row])
+        while self._date_rows[pos] != row:
+            pos += 1
+        return pos
+    
     def add_activity(self, activity: FitnessActivity) -> None:
         """Add a new activity to the tracker"""
         self.activities.append(activity)
-        self.save_data()
+        self._index_activity(activity)
+        day = self._date_arr[-1]
+        pos = bisect_right(self._date_keys, day)
+        self._date_keys.insert(pos, day)
+        self._date_rows.insert(pos, len(self._date_arr) - 1)
+        self._total_calories += activity.calories
+        self._total_duration += activity.duration
+        self._weekly_cache.clear()
+        if self._autosave and not self._dirty:
+            # The file is in sync, so only the new line needs writing
+            self._append_data(activity)
+        else:
+            self._mark_dirty()
+    
+    def bulk_add(self, activities: Iterable[FitnessActivity]) -> None:
+        """Add several activities, saving to file only once"""
+        with self:
+            for activity in activities:
+                self.add_activity(activity)
     
     def delete_activity(self, index: int) -> bool:
         """Delete an activity by index"""
         if 0 <= index < len(self.activities):
+            activity = self.activities[index]
+            self._unindex_activity(activity)
+            self._weekly_cache.clear()
+            pos = self._date_slot(index)
+            del self._date_keys[pos]
+            del self._date_rows[pos]
+            # Later rows shift down by one once the activity is removed
+            self._date_rows = array('i', (row - (row > index) for row in self._date_rows))
+            # Delete in place rather than swapping with the last element, so
+            # the listing, the menu numbers and the saved file keep their order
             del self.activities[index]
-            self.save_data()
+            for column in (self._cal_arr, self._dur_arr, self._date_arr):
+                del column[index]
+            # Re-summed rather than subtracted so rounding error can't build up
+            self._recompute_totals()
+            self._mark_dirty()
             return True
         return False
     
     def get_activities_by_date(self, date: str) -> List[FitnessActivity]:
         """Get all activities for a specific date"""
-        return [activity for activity in self.activities if activity.date == date]
+        return list(self._by_date.get(date, []))
     
     def get_activities_by_type(self, activity_type: str) -> List[FitnessActivity]:
         """Get all activities of a specific type"""
-        return [activity for activity in self.activities 
-                if activity.activity_type.lower() == activity_type.lower()]
+        return list(self._by_type.get(activity_type.lower(), []))
     
     def get_total_calories(self) -> float:
         """Get total calories burned across all activities"""
-        return sum(activity.calories for activity in self.activities)
+        return self._total_calories
     
     def get_total_duration(self) -> float:
         """Get total duration across all activities (in minutes)"""
-        return sum(activity.duration for activity in self.activities)
+        return self._total_duration
     
     def get_weekly_summary(self, weeks_ago: int = 0) -> Dict[str, float]:
         """Get weekly summary of calories and duration"""
-        end_date = datetime.datetime.now() - datetime.timedelta(weeks=weeks_ago)
-        start_date = end_date - datetime.timedelta(days=7)
+        today = datetime.date.today()
+        if today != self._weekly_cache_day:
+            # Every window moves at midnight, so nothing cached earlier applies
+            self._weekly_cache.clear()
+            self._weekly_cache_day = today
+        cached = self._weekly_cache.get(weeks_ago)
+        if cached is not None:
+            return dict(cached)
         
-        weekly_activities = [
-            activity for activity in self.activities
-            if start_date <= datetime.datetime.strptime(activity.date, "%Y-%m-%d") <= end_date
-        ]
+        end_date = today - datetime.timedelta(weeks=weeks_ago)
+        start_date = end_date - datetime.timedelta(days=7)
+        start_day = start_date.toordinal()
+        end_day = end_date.toordinal()
         
-        total_calories = sum(activity.calories for activity in weekly_activities)
-        total_duration = sum(activity.duration for activity in weekly_activities)
+        # The window is seven days: the start day itself is excluded
+        lo = bisect_left(self._date_keys, start_day + 1)
+        hi = bisect_right(self._date_keys, end_day)
+        total_calories, total_duration, activity_count = _window_totals(
+            self._date_rows[lo:hi], self._cal_arr, self._dur_arr)
         
-        return {
+        summary = {
             'start_date': start_date.strftime("%Y-%m-%d"),
             'end_date': end_date.strftime("%Y-%m-%d"),
             'total_calories': total_calories,
             'total_duration': total_duration,
-            'activity_count': len(weekly_activities)
+            'activity_count': activity_count
         }
+        self._weekly_cache[weeks_ago] = summary
+        return dict(summary)
+    
+    def get_multi_weekly_summary(self, num_weeks: int) -> List[Dict[str, float]]:
+        """Get weekly summaries for the last num_weeks weeks in one pass
+        
+        Entry i of the result matches get_weekly_summary(i).
+        """
+        if num_weeks <= 0:
+            return []
+        today = datetime.date.today()
+        end_day = today.toordinal()
+        first_day = end_day - 7 * num_weeks
+        
+        # Weekly windows are disjoint, so each row falls in exactly one bucket
+        weekly_calories = [0.0] * num_weeks
+        weekly_duration = [0.0] * num_weeks
+        weekly_count = [0] * num_weeks
+        keys = self._date_keys
+        lo = bisect_left(keys, first_day + 1)
+        hi = bisect_right(keys, end_day)
+        # Bind the columns to locals so the loop avoids attribute lookups
+        calories = self._cal_arr
+        durations = self._dur_arr
+        for day, row in zip(keys[lo:hi], self._date_rows[lo:hi]):
+            bucket = (end_day - day) // 7
+            weekly_calories[bucket] += calories[row]
+            weekly_duration[bucket] += durations[row]
+            weekly_count[bucket] += 1
+        
+        summaries = []
+        for weeks_ago in range(num_weeks):
+            end_date = today - datetime.timedelta(weeks=weeks_ago)
+            start_date = end_date - datetime.timedelta(days=7)
+            summaries.append({
+                'start_date': start_date.strftime("%Y-%m-%d"),
+                'end_date': end_date.strftime("%Y-%m-%d"),
+                'total_calories': weekly_calories[weeks_ago],
+                'total_duration': weekly_duration[weeks_ago],
+                'activity_count': weekly_count[weeks_ago]
+            })
+        return summaries
     
     def save_data(self) -> None:
-        """Save activities to file"""
-        with open(self.data_file, 'w') as f:
-            json.dump([activity.to_dict() for activity in self.activities], f)
+        """Save activities to file, one JSON object per line"""
+        with open(self.data_file, 'wb') as f:
+            f.write(b"".join(activity.to_json() + b"\n" for activity in self.activities))
+        self._dirty = False
+    
+    def _append_data(self, activity: FitnessActivity) -> None:
+        """Append a single activity to the end of the file"""
+        with open(self.data_file, 'ab') as f:
+            f.write(activity.to_json() + b"\n")
     
     def load_data(self) -> None:
-        """Load activities from file"""
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.activities = [FitnessActivity.from_dict(item) for item in data]
+        """Load activities from file
+        
+        Files in the older single JSON array format are still read, but never
+        rewritten: their activities are saved to a ``.jsonl`` file alongside,
+        which the tracker uses from then on. A missing ``.jsonl`` data file
+        is likewise imported once from its legacy ``.json`` counterpart.
+        """
+        path = self.data_file
+        root = os.path.splitext(path)[0]
+        target = root + '.jsonl'
+        if not os.path.exists(path):
+            path = root + '.json'
+            if self.data_file != target or not os.path.exists(path):
+                return
+        items, legacy = _read_items(path)
+        if legacy and path == self.data_file and path != target:
+            # Leave the legacy file intact and continue in JSON Lines,
+            # reusing the file an earlier run already migrated it to
+            self.data_file = target
+            if os.path.exists(target):
+                path = target
+                items, legacy = _read_items(target)
+        self.activities = [FitnessActivity.from_dict(item) for item in items]
+        self._rebuild_indexes()
+        if legacy or path != self.data_file:
+            # Write imported activities out so later adds can append
+            self.save_data()
+    
+    def save_snapshot(self, path: str) -> None:
+        """Save activities to a compact binary columnar snapshot
+        
+        The JSON Lines data file stays the interchange format; snapshots are
+        pickles, so only load ones you created yourself.
+        """
+        snapshot = {
+            'dates': self._date_arr,
+            'durations': self._dur_arr,
+            'calories': self._cal_arr,
+            'distances': [activity.distance for activity in self.activities],
+            'types': [activity.activity_type for activity in self.activities],
+            'notes': [activity.notes for activity in self.activities]
+        }
+        with open(path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=5)
+    
+    def load_snapshot(self, path: str) -> None:
+        """Replace activities with those from a snapshot
+        
+        The data file is not rewritten until the next save or flush().
+        """
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+        fromordinal = datetime.date.fromordinal
+        self.activities = [
+            FitnessActivity(activity_type, duration, calories,
+                            fromordinal(day).isoformat(), distance, notes)
+            for day, duration, calories, distance, activity_type, notes in zip(
+                snapshot['dates'], snapshot['durations'], snapshot['calories'],
+                snapshot['distances'], snapshot['types'], snapshot['notes'])
+        ]
+        self._rebuild_indexes()
+        self._dirty = True
     
     def display_all_activities(self) -> None:
         """Display all activities in a readable format"""
-        print("\nAll Fitness Activities:")
-        print("-" * 50)
+        # Build the whole report and write it once rather than per line
+        separator = "-" * 50
+        lines = ["", "All Fitness Activities:", separator]
         for i, activity in enumerate(self.activities, 1):
-            print(f"{i}. {activity.date} - {activity.activity_type}")
-            print(f"   Duration: {activity.duration} min | Calories: {activity.calories}")
+            lines.append(f"{i}. {activity.date} - {activity.activity_type}")
+            lines.append(f"   Duration: {activity.duration} min | Calories: {activity.calories}")
             if activity.distance:
-                print(f"   Distance: {activity.distance} km")
+                lines.append(f"   Distance: {activity.distance} km")
             if activity.notes:
-                print(f"   Notes: {activity.notes}")
-            print("-" * 50)
+                lines.append(f"   Notes: {activity.notes}")
+            lines.append(separator)
+        sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     tracker = FitnessTracker()